@@ -5,5 +5,8 @@ set -euo pipefail
 
 SCRIPT_URL="https://raw.githubusercontent.com/data-yaml/seqera-smoke-test/parse-wrroc/scripts/post_run_sqs.py"
 
+# Python script uses boto3 for STS/S3/SQS, which must be in the compute environment image
+# (it exits with "boto3 Not Available" otherwise); ijson/orjson are optional speedups
+
 echo "Downloading and executing post-run script from GitHub..."
 curl -sSfL "$SCRIPT_URL" | python3 -
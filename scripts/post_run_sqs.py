@@ -3,26 +3,197 @@
 Post-run script for Seqera Platform - sends SQS message with workflow metadata
 Downloads and executes from GitHub to bypass Seqera Platform's 1024-byte post-run script limit
 
-This version fetches comprehensive workflow details from Seqera Platform API including
-resolved parameters and configuration.
+Two modes share the same WRROC/SQS path:
+- API mode (default when TOWER_ACCESS_TOKEN is set): fetches comprehensive workflow
+  details from Seqera Platform API including resolved parameters and configuration
+- CLI mode: queue URL, region and output folder are passed as arguments, e.g.
+  post_run_sqs.py --queue-url URL --outdir s3://bucket/prefix [--region REGION]
 """
 
 import argparse
+import functools
 import json
+import logging
 import os
+import stat
 import sys
-import subprocess
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, Optional
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+try:
+    import boto3
+    import urllib3
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    boto3 = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+log = logging.getLogger("post_run_sqs")
+
+
+def configure_logging() -> None:
+    """
+    Send this script's log records to stdout as bare messages; LOG_LEVEL selects verbosity
+
+    Only the post_run_sqs logger is configured: the root, botocore and urllib3
+    loggers stay at WARNING, so LOG_LEVEL=DEBUG never dumps signed requests
+    (including session tokens) into the run log.
+    """
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    if not isinstance(logging.getLevelName(level), int):
+        level = "INFO"
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(level)
+    log.propagate = False
+
+
+# Single boto3 Session shared by all clients, created on first use
+_session = None
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+# Sessions are not thread-safe; clients are, once created
+_clients_lock = threading.Lock()
+
+
+def aws_client(service: str, region: Optional[str] = None):
+    """Return a cached boto3 client for service/region"""
+    global _session
+    key = (service, region)
+    with _clients_lock:
+        if key not in _clients:
+            if _session is None:
+                _session = boto3.Session()
+            _clients[key] = _session.client(service, region_name=region)
+        return _clients[key]
+
+
+# Keep-alive connection pool for Seqera Platform API calls, created on first use
+_http = None
+
+
+def http_pool():
+    """Return the shared urllib3 PoolManager with retry/backoff on transient errors"""
+    global _http
+    if _http is None:
+        _http = urllib3.PoolManager(
+            maxsize=4,
+            retries=urllib3.Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        )
+    return _http
+
+
+def split_s3_path(path: str) -> Tuple[str, str]:
+    """Split s3://bucket/key into (bucket, key)"""
+    bucket, _, key = path[len("s3://"):].partition("/")
+    return bucket, key
 
 
 def print_header(msg: str):
-    """Print a formatted header"""
+    """Log a formatted header"""
     sep = "=" * 60
-    print(f"\n{sep}\n{msg}\n{sep}\n")
+    log.info(f"\n{sep}\n{msg}\n{sep}\n")
+
+
+# Seqera API responses are cached briefly so retried/replayed hooks skip the fetch
+WORKFLOW_CACHE_TTL_SECONDS = 60
+# Stale copies back up a failed API call only up to this age; older ones are deleted
+WORKFLOW_CACHE_MAX_STALE_SECONDS = 3600
+
+
+def workflow_cache_dir() -> Optional[Path]:
+    """Per-user cache directory (XDG_CACHE_HOME or ~/.cache), or None if unusable"""
+    cache_home = os.path.expanduser(os.environ.get("XDG_CACHE_HOME", "~/.cache"))
+    if not os.path.isabs(cache_home):
+        return None
+    cache_dir = Path(cache_home) / "seqera-smoke"
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = cache_dir.lstat()
+    except OSError:
+        return None
+    # Refuse a directory someone else owns or can write to
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o022:
+        return None
+    return cache_dir
+
+
+def workflow_cache_path(cache_dir: Path, workflow_id: str, workspace_id: Optional[str]) -> Path:
+    """Cache file path for a workflow/workspace pair"""
+    return cache_dir / f"seqera-wf-{workflow_id}-{workspace_id or 'user'}.json"
+
+
+def read_workflow_cache(cache_path: Path) -> Tuple[Optional[float], Optional[Dict[str, Any]]]:
+    """Return (timestamp, workflow) from cache, or (None, None) if unusable"""
+    try:
+        fd = os.open(cache_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except OSError:
+        return None, None
+    try:
+        with os.fdopen(fd, "rb") as f:
+            # Only trust a regular file we own that nobody else can read or write
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                log.warning(f"⚠ Warning: Ignoring workflow cache with unsafe owner/mode: {cache_path}")
+                return None, None
+            cached = json.load(f)
+        ts, data = float(cached["ts"]), cached["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, None
+
+    age = time.time() - ts
+    if not 0 <= age < WORKFLOW_CACHE_MAX_STALE_SECONDS:
+        try:
+            cache_path.unlink()
+        except OSError:
+            pass
+        return None, None
+    return ts, data
+
+
+def write_workflow_cache(cache_path: Path, workflow: Dict[str, Any]) -> None:
+    """Atomically write workflow to cache and prune expired entries (best effort)"""
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        # O_EXCL|O_NOFOLLOW: never write through a pre-placed file or symlink
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0), 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"ts": time.time(), "data": workflow}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        log.warning(f"⚠ Warning: Could not cache workflow details: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+    # Cached workflows hold full params; don't leave old ones lying around
+    cutoff = time.time() - WORKFLOW_CACHE_MAX_STALE_SECONDS
+    for old_path in cache_path.parent.glob("seqera-wf-*.json"):
+        try:
+            if old_path.lstat().st_mtime < cutoff:
+                old_path.unlink()
+        except OSError:
+            pass
 
 
 def fetch_workflow_details() -> Optional[Dict[str, Any]]:
@@ -34,6 +205,10 @@ def fetch_workflow_details() -> Optional[Dict[str, Any]]:
     - Configuration
     - Launch details
     - Status and metadata
+
+    Responses are cached in a per-user directory for WORKFLOW_CACHE_TTL_SECONDS;
+    if the API call fails, a cached copy up to WORKFLOW_CACHE_MAX_STALE_SECONDS
+    old is returned when one exists.
     """
     print_header("Fetching Workflow Details from Seqera Platform API")
 
@@ -44,10 +219,10 @@ def fetch_workflow_details() -> Optional[Dict[str, Any]]:
 
     # Check for required variables
     if not access_token:
-        print("⚠ Warning: TOWER_ACCESS_TOKEN not set, skipping API fetch")
+        log.warning("⚠ Warning: TOWER_ACCESS_TOKEN not set, skipping API fetch")
         return None
     if not workflow_id:
-        print("⚠ Warning: TOWER_WORKFLOW_ID not set, skipping API fetch")
+        log.warning("⚠ Warning: TOWER_WORKFLOW_ID not set, skipping API fetch")
         return None
 
     # Determine API endpoint (default to cloud.seqera.io)
@@ -59,45 +234,100 @@ def fetch_workflow_details() -> Optional[Dict[str, Any]]:
     else:
         url = f"{api_base}/workflow/{workflow_id}"
 
-    print(f"API URL: {url}")
-    print(f"Workflow ID: {workflow_id}")
+    log.info(f"API URL: {url}")
+    log.info(f"Workflow ID: {workflow_id}")
     if workspace_id:
-        print(f"Workspace ID: {workspace_id}")
+        log.info(f"Workspace ID: {workspace_id}")
+
+    cache_dir = workflow_cache_dir()
+    cache_path = workflow_cache_path(cache_dir, workflow_id, workspace_id) if cache_dir else None
+    cached_ts, cached_workflow = read_workflow_cache(cache_path) if cache_path else (None, None)
+    if cached_workflow is not None and time.time() - cached_ts < WORKFLOW_CACHE_TTL_SECONDS:
+        log.info(f"✓ Using cached workflow details ({cache_path})")
+        return cached_workflow
+
+    def stale_fallback() -> Optional[Dict[str, Any]]:
+        if cached_workflow is None:
+            return None
+        age = int(time.time() - cached_ts)
+        log.info(f"  Falling back to cached workflow details ({age}s old)")
+        return cached_workflow
 
     try:
         # Make API request
-        request = Request(url)
-        request.add_header("Authorization", f"Bearer {access_token}")
-        request.add_header("Accept", "application/json")
-
-        with urlopen(request, timeout=30) as response:
-            if response.status == 200:
-                data = json.loads(response.read().decode('utf-8'))
-                workflow = data.get("workflow", {})
-
-                print(f"✓ Successfully fetched workflow details")
-                print(f"  Workflow: {workflow.get('runName', 'N/A')}")
-                print(f"  Status: {workflow.get('status', 'N/A')}")
-                print(f"  Project: {workflow.get('projectName', 'N/A')}")
-
-                return workflow
-            else:
-                print(f"⚠ Warning: API returned status {response.status}")
-                return None
-
-    except HTTPError as e:
-        print(f"⚠ Warning: HTTP error fetching workflow: {e.code} - {e.reason}")
-        if e.code == 401:
-            print("  Token may be expired or invalid")
-        return None
-    except URLError as e:
-        print(f"⚠ Warning: Network error fetching workflow: {e.reason}")
-        return None
+        response = http_pool().request(
+            "GET",
+            url,
+            headers={
+                "Authorization": f"Bearer {access_token}",
+                "Accept": "application/json",
+            },
+            timeout=30
+        )
+
+        if response.status == 200:
+            data = json.loads(response.data.decode('utf-8'))
+            workflow = data.get("workflow", {})
+
+            log.info(f"✓ Successfully fetched workflow details")
+            log.info(f"  Workflow: {workflow.get('runName', 'N/A')}")
+            log.info(f"  Status: {workflow.get('status', 'N/A')}")
+            log.info(f"  Project: {workflow.get('projectName', 'N/A')}")
+
+            if cache_path:
+                write_workflow_cache(cache_path, workflow)
+            return workflow
+
+        log.warning(f"⚠ Warning: HTTP error fetching workflow: {response.status} - {response.reason}")
+        if response.status == 401:
+            log.info("  Token may be expired or invalid")
+        return stale_fallback()
+
+    except urllib3.exceptions.HTTPError as e:
+        log.warning(f"⚠ Warning: Network error fetching workflow: {e}")
+        return stale_fallback()
     except Exception as e:
-        print(f"⚠ Warning: Unexpected error fetching workflow: {e}")
+        log.warning(f"⚠ Warning: Unexpected error fetching workflow: {e}")
         return None
 
 
+# Message metadata key -> path into the Seqera Platform API workflow object
+_API_SPEC = (
+    # Basic workflow info
+    ("api_run_name", ("runName",)),
+    ("api_project_name", ("projectName",)),
+    ("api_status", ("status",)),
+    ("api_session_id", ("sessionId",)),
+    # Launch details
+    ("api_launch_id", ("launch", "id")),
+    ("api_launch_pipeline", ("launch", "pipeline")),
+    ("api_launch_revision", ("launch", "revision")),
+    ("api_launch_config_profiles", ("launch", "configProfiles")),
+    # Compute environment
+    ("api_compute_env_id", ("computeEnvId",)),
+    ("api_compute_env_name", ("computeEnv", "name")),
+    # Work directory
+    ("api_workdir", ("workDir",)),
+    # Execution details
+    ("api_start", ("start",)),
+    ("api_complete", ("complete",)),
+    ("api_duration", ("duration",)),
+    # Container
+    ("api_container", ("container",)),
+)
+
+
+def _dig(data: Any, path: Tuple[str, ...]) -> Any:
+    """Follow path through nested dicts, returning None if any step is missing"""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+        if data is None:
+            return None
+    return data
+
+
 def extract_api_metadata(workflow_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Extract relevant metadata from Seqera Platform API workflow response
@@ -111,190 +341,213 @@ def extract_api_metadata(workflow_data: Optional[Dict[str, Any]]) -> Dict[str, A
     if not workflow_data:
         return {}
 
-    print("\nExtracting metadata from API response...")
-
-    metadata = {}
+    log.info("\nExtracting metadata from API response...")
 
-    # Basic workflow info
-    metadata["api_run_name"] = workflow_data.get("runName")
-    metadata["api_project_name"] = workflow_data.get("projectName")
-    metadata["api_status"] = workflow_data.get("status")
-    metadata["api_session_id"] = workflow_data.get("sessionId")
+    # Scalar fields declared in _API_SPEC, skipping missing ones
+    metadata = {
+        key: value
+        for key, path in _API_SPEC
+        if (value := _dig(workflow_data, path)) is not None
+    }
 
     # Resolved parameters (this is what you're looking for!)
     params = workflow_data.get("params")
     if params:
         metadata["api_params"] = params
-        print(f"✓ Found resolved parameters:")
-        print(f"  {json.dumps(params, indent=2)}")
+        log.info(f"✓ Found {len(params)} resolved parameters")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"  {json.dumps(params, indent=2)}")
 
-    # Launch details
-    launch = workflow_data.get("launch")
-    if launch:
-        metadata["api_launch_id"] = launch.get("id")
-        metadata["api_launch_pipeline"] = launch.get("pipeline")
-        metadata["api_launch_revision"] = launch.get("revision")
-        metadata["api_launch_config_profiles"] = launch.get("configProfiles")
+    log.info(f"\n✓ Extracted {len(metadata)} fields from API response")
 
-    # Compute environment
-    metadata["api_compute_env_id"] = workflow_data.get("computeEnvId")
-    metadata["api_compute_env_name"] = workflow_data.get("computeEnv", {}).get("name")
+    return metadata
 
-    # Work directory
-    metadata["api_workdir"] = workflow_data.get("workDir")
 
-    # Execution details
-    metadata["api_start"] = workflow_data.get("start")
-    metadata["api_complete"] = workflow_data.get("complete")
-    metadata["api_duration"] = workflow_data.get("duration")
+def check_aws_credentials() -> bool:
+    """Check if AWS credentials are configured"""
+    log.info("\nChecking AWS credentials...")
+    try:
+        identity = aws_client("sts").get_caller_identity()
+        log.info(f"✓ AWS credentials found")
+        log.info(f"  Account: {identity.get('Account')}")
+        log.info(f"  User/Role: {identity.get('Arn')}")
+        return True
+    except (BotoCoreError, ClientError) as e:
+        log.error(f"✗ AWS credentials check failed: {e}")
+        return False
+    except Exception as e:
+        log.error(f"✗ Error checking credentials: {e}")
+        return False
 
-    # Container
-    metadata["api_container"] = workflow_data.get("container")
 
-    # Remove None values
-    metadata = {k: v for k, v in metadata.items() if v is not None}
+class _LocalPath:
+    """Local file behind the exists()/open() interface shared with _S3Path"""
+    kind = "Local"
 
-    print(f"\n✓ Extracted {len(metadata)} fields from API response")
+    def __init__(self, path: str):
+        self.path = path
 
-    return metadata
+    def exists(self) -> bool:
+        # One stat() call; a missing and an empty file both mean "not written yet",
+        # as does any other stat() failure (ENOTDIR, ELOOP, EACCES), like Path.exists()
+        try:
+            return os.stat(self.path).st_size > 0
+        except OSError:
+            return False
 
+    def open(self):
+        return open(self.path, "rb")
 
-def check_aws_cli() -> bool:
-    """Check if AWS CLI is available"""
-    print("Checking AWS CLI availability...")
-    try:
-        result = subprocess.run(
-            ["aws", "--version"],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        if result.returncode == 0:
-            print(f"✓ AWS CLI found: {result.stdout.strip()}")
-            return True
-        else:
-            print(f"✗ AWS CLI check failed: {result.stderr}")
-            return False
-    except FileNotFoundError:
-        print("✗ AWS CLI not found in PATH")
-        return False
 
+class _S3Path:
+    """S3 object behind the exists()/open() interface; bucket/key parsed once"""
+    kind = "S3"
 
-def check_aws_credentials() -> bool:
-    """Check if AWS credentials are configured"""
-    print("\nChecking AWS credentials...")
-    try:
-        result = subprocess.run(
-            ["aws", "sts", "get-caller-identity"],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        if result.returncode == 0:
-            identity = json.loads(result.stdout)
-            print(f"✓ AWS credentials found")
-            print(f"  Account: {identity.get('Account')}")
-            print(f"  User/Role: {identity.get('Arn')}")
-            return True
-        else:
-            print(f"✗ AWS credentials check failed: {result.stderr}")
-            return False
-    except Exception as e:
-        print(f"✗ Error checking credentials: {e}")
-        return False
+    def __init__(self, path: str):
+        self.path = path
+        self.bucket, self.key = split_s3_path(path)
 
+    def exists(self) -> bool:
+        try:
+            response = aws_client("s3").head_object(Bucket=self.bucket, Key=self.key)
+        except ClientError as e:
+            # Only "not found" means keep waiting; surface anything else
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return response.get("ContentLength", 0) > 0
+
+    def open(self):
+        return aws_client("s3").get_object(Bucket=self.bucket, Key=self.key)["Body"]
 
-def file_exists(path: str) -> bool:
-    """Check if file exists (supports both local and S3 paths)"""
-    if path.startswith("s3://"):
-        result = subprocess.run(
-            ["aws", "s3", "ls", path],
-            capture_output=True,
-            check=False
-        )
-        return result.returncode == 0
-    else:
-        return Path(path).exists() and Path(path).stat().st_size > 0
+
+def _as_path(path: str):
+    """Wrap a local or s3:// path in the matching adapter"""
+    return _S3Path(path) if path.startswith("s3://") else _LocalPath(path)
 
 
 def wait_for_wrroc_file(wrroc_path: str, max_wait_seconds: int = 60) -> bool:
-    """Wait for WRROC file to be written by nf-prov plugin"""
-    import time
-
-    path_type = "S3" if wrroc_path.startswith("s3://") else "Local"
-    print(f"\nWaiting for WRROC file to be written by nf-prov plugin...")
-    print(f"Target path: {wrroc_path}")
-    print(f"Path type: {path_type}")
-
-    check_interval = 0.5  # 500ms
-    attempts = int(max_wait_seconds / check_interval)
-
-    for i in range(attempts):
-        if file_exists(wrroc_path):
-            print(f"✓ WRROC file found: {wrroc_path}")
-            return True
-        time.sleep(check_interval)
-
-    print(f"⚠ Warning: WRROC file not found after {max_wait_seconds}s")
-    print(f"Expected path: {wrroc_path}")
-    print("Proceeding with SQS notification, but WRROC file may be missing.")
+    """
+    Wait for WRROC file to be written by nf-prov plugin
+
+    Polls with exponential backoff (100ms doubling up to 2s) so a file that
+    lands quickly is seen almost immediately, while a slow one costs few checks.
+    """
+    target = _as_path(wrroc_path)
+    log.info(f"\nWaiting for WRROC file to be written by nf-prov plugin...")
+    log.info(f"Target path: {wrroc_path}")
+    log.info(f"Path type: {target.kind}")
+
+    delay = 0.1
+    max_delay = 2.0
+    deadline = time.monotonic() + max_wait_seconds
+    last_error = None
+
+    while True:
+        try:
+            if target.exists():
+                log.info(f"✓ WRROC file found: {wrroc_path}")
+                return True
+        except ClientError as e:
+            # Access denied won't fix itself; throttling, 5xx etc. mean "not yet"
+            if e.response.get("Error", {}).get("Code") in ("403", "AccessDenied", "Forbidden"):
+                log.warning(f"⚠ Warning: Cannot check WRROC file: {e}")
+                return False
+            last_error = e
+            log.debug(f"  Transient error checking WRROC file: {e}")
+        except BotoCoreError as e:
+            # Connection errors, timeouts, missing credentials: keep polling
+            last_error = e
+            log.debug(f"  Transient error checking WRROC file: {e}")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+    log.warning(f"⚠ Warning: WRROC file not found after {max_wait_seconds}s")
+    if last_error is not None:
+        log.info(f"Last error: {last_error}")
+    log.info(f"Expected path: {wrroc_path}")
+    log.info("Proceeding with SQS notification, but WRROC file may be missing.")
     return False
 
 
-def extract_wrroc_metadata(wrroc_path: str) -> Dict[str, Any]:
-    """Extract metadata from WRROC file"""
-    print("\nExtracting WRROC metadata...")
+def iter_wrroc_graph(wrroc_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield @graph entities from a WRROC file (supports both local and S3 paths)
 
-    temp_file = None
+    With ijson installed, entities are stream-parsed one at a time straight from
+    the file or S3 response body; otherwise the whole document is json-loaded.
+    """
+    source = _as_path(wrroc_path).open()
     try:
-        # Download S3 file if needed
-        if wrroc_path.startswith("s3://"):
-            temp_file = "/tmp/wrroc-metadata.json"
-            result = subprocess.run(
-                ["aws", "s3", "cp", wrroc_path, temp_file],
-                capture_output=True,
-                check=False
-            )
-            if result.returncode != 0:
-                print("⚠ Warning: Failed to download WRROC file from S3")
-                return {}
-            wrroc_path = temp_file
+        if ijson is not None:
+            yield from ijson.items(source, "@graph.item", use_float=True)
+        else:
+            yield from json.load(source).get("@graph", [])
+    finally:
+        source.close()
 
-        # Parse WRROC JSON
-        with open(wrroc_path) as f:
-            wrroc = json.load(f)
 
-        metadata = {}
-        graph = wrroc.get("@graph", [])
+def extract_wrroc_metadata(wrroc_path: str) -> Dict[str, Any]:
+    """Extract metadata from WRROC file"""
+    log.info("\nExtracting WRROC metadata...")
 
-        # Find root dataset
-        root = next((e for e in graph if e.get("@id") == "./"), None)
+    try:
+        metadata = {}
+        root = None
+        author = None
+        author_id = None
+        workflow_run = None
+        main_workflow = None
+        # Entities seen before the root dataset says which one is its author; matched
+        # by @id only, since @type may be a list and the author need not have a name
+        # (in RO-Crate only the metadata descriptor usually precedes the root)
+        contextual = {}
+
+        for entity in iter_wrroc_graph(wrroc_path):
+            entity_id = entity.get("@id")
+            if entity_id == "./" and root is None:
+                root = entity
+                author_id = root.get("author", {}).get("@id")
+                author = contextual.get(author_id)
+                contextual.clear()
+            elif entity_id == "main-sqs.nf" and main_workflow is None:
+                main_workflow = entity
+            elif (workflow_run is None
+                  and entity.get("@type") == "CreateAction"
+                  and entity.get("name", "").startswith("Nextflow workflow run")):
+                workflow_run = entity
+            elif root is None:
+                if entity_id:
+                    contextual.setdefault(entity_id, entity)
+            elif author is None and author_id and entity_id == author_id:
+                author = entity
+
+            # Stop reading as soon as every target entity has been seen
+            if (root is not None and workflow_run is not None and main_workflow is not None
+                    and (author is not None or not author_id)):
+                break
+
+        # Root dataset
         if root:
             metadata["wrroc_name"] = root.get("name")
             metadata["wrroc_date_published"] = root.get("datePublished")
             metadata["wrroc_license"] = root.get("license")
 
-            author_id = root.get("author", {}).get("@id")
-            if author_id:
-                author = next((e for e in graph if e.get("@id") == author_id), None)
-                if author:
-                    metadata["wrroc_author_name"] = author.get("name")
-                    metadata["wrroc_author_orcid"] = author_id
-
-        # Find workflow run
-        workflow_run = next(
-            (e for e in graph
-             if e.get("@type") == "CreateAction"
-             and e.get("name", "").startswith("Nextflow workflow run")),
-            None
-        )
+            if author_id and author:
+                metadata["wrroc_author_name"] = author.get("name")
+                metadata["wrroc_author_orcid"] = author_id
+
+        # Workflow run
         if workflow_run:
             metadata["wrroc_run_id"] = workflow_run.get("@id", "").lstrip("#")
             metadata["wrroc_start_time"] = workflow_run.get("startTime")
             metadata["wrroc_end_time"] = workflow_run.get("endTime")
 
-        # Find main workflow
-        main_workflow = next((e for e in graph if e.get("@id") == "main-sqs.nf"), None)
+        # Main workflow
         if main_workflow:
             metadata["wrroc_runtime_platform"] = main_workflow.get("runtimePlatform")
             prog_lang = main_workflow.get("programmingLanguage", {})
@@ -304,50 +557,66 @@ def extract_wrroc_metadata(wrroc_path: str) -> Dict[str, Any]:
         # Remove None values
         metadata = {k: v for k, v in metadata.items() if v is not None}
 
-        print(f"Extracted {len(metadata)} metadata fields from WRROC file")
+        log.info(f"Extracted {len(metadata)} metadata fields from WRROC file")
         return metadata
 
+    except ClientError as e:
+        log.warning(f"⚠ Warning: Failed to download WRROC file from S3: {e}")
+        return {}
     except Exception as e:
-        print(f"⚠ Warning: Failed to extract WRROC metadata: {e}")
+        log.warning(f"⚠ Warning: Failed to extract WRROC metadata: {e}")
         return {}
-    finally:
-        # Clean up temp file
-        if temp_file and Path(temp_file).exists():
-            Path(temp_file).unlink()
+
+
+# Message metadata key, environment variable, default (None = omit when unset)
+_ENV_MAP = (
+    # Run identification
+    ("tower_workflow_id", "TOWER_WORKFLOW_ID", "unknown"),
+    ("tower_run_name", "TOWER_RUN_NAME", "unknown"),
+    ("tower_project_id", "TOWER_PROJECT_ID", None),
+    ("tower_workspace_id", "TOWER_WORKSPACE_ID", None),
+    ("tower_user_id", "TOWER_USER_ID", None),
+    # Status and outcome
+    ("tower_workflow_status", "TOWER_WORKFLOW_STATUS", "SUCCEEDED"),
+    ("tower_workflow_start", "TOWER_WORKFLOW_START", None),
+    ("tower_workflow_complete", "TOWER_WORKFLOW_COMPLETE", None),
+    # Storage
+    ("tower_workdir", "TOWER_WORKDIR", None),
+    ("tower_outdir", "TOWER_OUTDIR", None),
+    # Pipeline metadata
+    ("tower_pipeline", "TOWER_PIPELINE", None),
+    ("tower_pipeline_revision", "TOWER_PIPELINE_REVISION", None),
+    ("tower_nextflow_version", "TOWER_NEXTFLOW_VERSION", None),
+    ("tower_executor", "TOWER_EXECUTOR", None),
+    # Legacy Nextflow variables (if available)
+    ("nextflow_version", "NXF_VER", None),
+    ("workflow_name", "NXF_WORKFLOW_NAME", None),
+    ("session_id", "NXF_SESSION_ID", None),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _env_metadata() -> Tuple[Tuple[str, str], ...]:
+    """
+    Seqera Platform environment variables (TOWER_*) as (key, value) pairs, skipping unset ones
+
+    Cached for the process lifetime: the environment does not change mid-run.
+    """
+    environ = os.environ
+    return tuple(
+        (key, value)
+        for key, name, default in _ENV_MAP
+        if (value := environ.get(name, default)) is not None
+    )
 
 
 def build_sqs_message(outdir: str, wrroc_metadata: Dict[str, Any], api_metadata: Dict[str, Any]) -> Dict[str, Any]:
     """Build SQS message body with workflow, WRROC, and API metadata"""
 
-    # Extract Seqera Platform environment variables (TOWER_*)
-    metadata = {
-        # Run identification
-        "tower_workflow_id": os.getenv("TOWER_WORKFLOW_ID", "unknown"),
-        "tower_run_name": os.getenv("TOWER_RUN_NAME", "unknown"),
-        "tower_project_id": os.getenv("TOWER_PROJECT_ID"),
-        "tower_workspace_id": os.getenv("TOWER_WORKSPACE_ID"),
-        "tower_user_id": os.getenv("TOWER_USER_ID"),
-        # Status and outcome
-        "tower_workflow_status": os.getenv("TOWER_WORKFLOW_STATUS", "SUCCEEDED"),
-        "tower_workflow_start": os.getenv("TOWER_WORKFLOW_START"),
-        "tower_workflow_complete": os.getenv("TOWER_WORKFLOW_COMPLETE"),
-        # Storage
-        "tower_workdir": os.getenv("TOWER_WORKDIR"),
-        "tower_outdir": os.getenv("TOWER_OUTDIR"),
-        # Pipeline metadata
-        "tower_pipeline": os.getenv("TOWER_PIPELINE"),
-        "tower_pipeline_revision": os.getenv("TOWER_PIPELINE_REVISION"),
-        "tower_nextflow_version": os.getenv("TOWER_NEXTFLOW_VERSION"),
-        "tower_executor": os.getenv("TOWER_EXECUTOR"),
-        # Legacy Nextflow variables (if available)
-        "nextflow_version": os.getenv("NXF_VER"),
-        "workflow_name": os.getenv("NXF_WORKFLOW_NAME"),
-        "session_id": os.getenv("NXF_SESSION_ID"),
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
-    # Remove None values
-    metadata = {k: v for k, v in metadata.items() if v is not None}
+    # Seqera Platform environment variables (TOWER_*)
+    metadata = dict(_env_metadata())
+    now = datetime.now(timezone.utc)
+    metadata["timestamp"] = now.isoformat().replace("+00:00", "Z")
 
     # Merge WRROC metadata
     metadata.update(wrroc_metadata)
@@ -358,118 +627,238 @@ def build_sqs_message(outdir: str, wrroc_metadata: Dict[str, Any], api_metadata:
     message = {
         "source_prefix": f"{outdir}/",
         "metadata": metadata,
-        "commit_message": f"Seqera Platform workflow completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        "commit_message": f"Seqera Platform workflow completed at {now:%Y-%m-%d %H:%M:%S} UTC"
     }
 
     return message
 
 
-def send_sqs_message(queue_url: str, region: str, message: Dict[str, Any]) -> bool:
-    """Send SQS message"""
-    print_header("Sending SQS Message")
-
-    message_json = json.dumps(message, indent=2)
-    print("Message body:")
-    print(message_json)
-    print()
+def encode_message_body(message: Dict[str, Any]) -> str:
+    """Compact JSON for the SQS wire payload (orjson when available)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(message).decode("utf-8")
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits in API params; stdlib json handles them
+            pass
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+# SendMessageBatch accepts at most 10 entries per call
+SQS_BATCH_SIZE = 10
+# ...and at most the single-message size limit (256 KiB) across all bodies
+SQS_BATCH_MAX_BYTES = 256 * 1024
+# Characters of each message body shown at INFO level
+MESSAGE_PREVIEW_CHARS = 200
+
+
+def batch_message_bodies(bodies: List[str]) -> Iterator[List[Tuple[int, str]]]:
+    """Group (index, body) pairs into SendMessageBatch calls by entry count and total UTF-8 size"""
+    chunk = []
+    chunk_bytes = 0
+    for index, body in enumerate(bodies):
+        size = len(body.encode("utf-8"))
+        if chunk and (len(chunk) == SQS_BATCH_SIZE or chunk_bytes + size > SQS_BATCH_MAX_BYTES):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append((index, body))
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def send_sqs_messages(queue_url: str, region: str, messages: List[Dict[str, Any]]) -> bool:
+    """Send SQS messages via SendMessageBatch, up to 10 entries / 256 KiB per call"""
+    print_header("Sending SQS Message" if len(messages) == 1 else f"Sending {len(messages)} SQS Messages")
+
+    bodies = [encode_message_body(message) for message in messages]
+
+    # Log a bounded preview; the pretty-printed full body only at DEBUG
+    for message, body in zip(messages, bodies):
+        preview = body if len(body) <= MESSAGE_PREVIEW_CHARS else body[:MESSAGE_PREVIEW_CHARS] + "..."
+        log.info(f"Message body ({len(body.encode('utf-8'))} bytes): {preview}\n")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"Full message body:\n{json.dumps(message, indent=2)}\n")
+
+    sqs = aws_client("sqs", region)
+    successful = []
+    failed = []
 
     try:
-        result = subprocess.run(
-            [
-                "aws", "sqs", "send-message",
-                "--queue-url", queue_url,
-                "--region", region,
-                "--message-body", message_json
-            ],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        for chunk in batch_message_bodies(bodies):
+            response = sqs.send_message_batch(
+                QueueUrl=queue_url,
+                Entries=[
+                    {"Id": str(index), "MessageBody": body}
+                    for index, body in chunk
+                ]
+            )
+            successful.extend(response.get("Successful", []))
+            failed.extend(response.get("Failed", []))
 
-        print_header("✓✓✓ SQS Integration SUCCESS ✓✓✓")
-        print("Message sent successfully to queue!")
-        print(f"\nQueue URL: {queue_url}")
-        print(f"Region: {region}")
-        print(f"\nAWS SQS Response:")
-        print(result.stdout)
-        return True
+    except (BotoCoreError, ClientError) as e:
+        print_header("ERROR: SQS Message Send Failed")
+        log.info(f"Queue URL: {queue_url}")
+        log.info(f"Region: {region}")
+        log.error(f"\nError details:\n{e}")
+        return False
 
-    except subprocess.CalledProcessError as e:
+    if failed:
         print_header("ERROR: SQS Message Send Failed")
-        print(f"Exit Code: {e.returncode}")
-        print(f"Queue URL: {queue_url}")
-        print(f"Region: {region}")
-        print(f"\nError details:")
-        print(e.stderr)
+        log.info(f"Queue URL: {queue_url}")
+        log.info(f"Region: {region}")
+        log.error(f"\n{len(failed)} of {len(bodies)} message(s) failed:")
+        for entry in failed:
+            log.error(f"  [{entry.get('Id')}] {entry.get('Code')}: {entry.get('Message')}")
         return False
 
+    print_header("✓✓✓ SQS Integration SUCCESS ✓✓✓")
+    log.info("Message sent successfully to queue!" if len(bodies) == 1 else f"{len(bodies)} messages sent successfully to queue!")
+    log.info(f"\nQueue URL: {queue_url}")
+    log.info(f"Region: {region}")
+    log.info(f"\nAWS SQS Response:")
+    for entry in successful:
+        log.info(f"  MessageId: {entry.get('MessageId')}")
+        log.info(f"  MD5OfMessageBody: {entry.get('MD5OfMessageBody')}")
+    return True
 
-def main():
-    print_header("SQS Integration - Post-Run Script")
 
-    # Step 1: Fetch workflow details from Seqera Platform API
-    # This gets us ALL the params including sqs_queue_url, sqs_region, outdir
-    workflow_data = fetch_workflow_details()
-    if not workflow_data:
-        print("ERROR: Failed to fetch workflow data from Seqera Platform API")
-        sys.exit(1)
+def send_sqs_message(queue_url: str, region: str, message: Dict[str, Any]) -> bool:
+    """Send a single SQS message"""
+    return send_sqs_messages(queue_url, region, [message])
+
+
+def publish_run_metadata(
+    queue_url: str,
+    region: str,
+    outdir: str,
+    api_metadata: Dict[str, Any],
+    wrroc_found: bool
+) -> bool:
+    """Extract WRROC metadata (if the file was found), then build and send the SQS message"""
+    wrroc_path = f"{outdir}/ro-crate-metadata.json"
+
+    # Extract WRROC metadata if file exists
+    wrroc_metadata = {}
+    if wrroc_found:
+        wrroc_metadata = extract_wrroc_metadata(wrroc_path)
+        if wrroc_metadata and log.isEnabledFor(logging.DEBUG):
+            log.debug(f"\nExtracted WRROC metadata:\n{json.dumps(wrroc_metadata, indent=2)}")
 
-    # Extract params from API response
-    params = workflow_data.get("params", {})
-    queue_url = params.get("sqs_queue_url")
-    region = params.get("sqs_region", "us-east-1")
-    outdir = params.get("outdir")
+    # Build and send SQS message
+    message = build_sqs_message(outdir, wrroc_metadata, api_metadata)
+    return send_sqs_message(queue_url, region, message)
 
-    # Validate required parameters
-    if not outdir:
-        print("ERROR: params.outdir not set in workflow")
-        sys.exit(1)
 
-    if not queue_url:
-        print("ERROR: params.sqs_queue_url not set in workflow")
-        print("Please set --params.sqs_queue_url when launching")
-        sys.exit(1)
+def main_api() -> bool:
+    """Post-run flow driven by the Seqera Platform API (TOWER_* environment variables)"""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Step 1: Fetch workflow details from Seqera Platform API
+        # This gets us ALL the params including sqs_queue_url, sqs_region, outdir.
+        # The AWS credentials check is independent I/O, so run it alongside.
+        workflow_future = executor.submit(fetch_workflow_details)
+        credentials_future = executor.submit(check_aws_credentials)
 
-    print(f"Queue URL: {queue_url}")
-    print(f"Region: {region}")
-    print(f"Output folder: {outdir}")
+        workflow_data = workflow_future.result()
+        if not workflow_data:
+            log.error("ERROR: Failed to fetch workflow data from Seqera Platform API")
+            sys.exit(1)
 
-    # Step 2: Check AWS CLI and credentials
-    if not check_aws_cli():
-        print_header("ERROR: AWS CLI Not Available")
-        print("The AWS CLI is not installed or not in PATH in this compute environment.")
-        sys.exit(1)
+        # Extract params from API response
+        params = workflow_data.get("params", {})
+        queue_url = params.get("sqs_queue_url")
+        region = params.get("sqs_region", "us-east-1")
+        outdir = params.get("outdir")
+
+        # Validate required parameters
+        if not outdir:
+            log.error("ERROR: params.outdir not set in workflow")
+            sys.exit(1)
+
+        if not queue_url:
+            log.error("ERROR: params.sqs_queue_url not set in workflow")
+            log.info("Please set --params.sqs_queue_url when launching")
+            sys.exit(1)
+
+        log.info(f"Queue URL: {queue_url}")
+        log.info(f"Region: {region}")
+        log.info(f"Output folder: {outdir}")
+
+        # Step 2: Check AWS credentials
+        if not credentials_future.result():
+            print_header("ERROR: AWS Credentials Not Configured")
+            log.info("AWS credentials are not available in this compute environment.")
+            sys.exit(1)
+
+        # Step 3: Start waiting for WRROC file while API metadata is extracted
+        wrroc_future = executor.submit(wait_for_wrroc_file, f"{outdir}/ro-crate-metadata.json")
 
+        # Step 4: Extract API metadata
+        api_metadata = extract_api_metadata(workflow_data)
+
+        if api_metadata and log.isEnabledFor(logging.DEBUG):
+            log.debug(f"\nExtracted API metadata:\n{json.dumps(api_metadata, indent=2)}")
+
+        wrroc_found = wrroc_future.result()
+
+    # Steps 5-6: Extract WRROC metadata, build and send SQS message
+    return publish_run_metadata(queue_url, region, outdir, api_metadata, wrroc_found)
+
+
+def main_cli(args: argparse.Namespace) -> bool:
+    """Post-run flow driven by command-line arguments (no Seqera Platform API access)"""
+    log.info(f"Queue URL: {args.queue_url}")
+    log.info(f"Region: {args.region}")
+    log.info(f"Output folder: {args.outdir}")
+
+    # Step 1: Check AWS credentials
     if not check_aws_credentials():
         print_header("ERROR: AWS Credentials Not Configured")
-        print("AWS credentials are not available in this compute environment.")
+        log.info("AWS credentials are not available in this compute environment.")
         sys.exit(1)
 
-    # Step 3: Extract API metadata
-    api_metadata = extract_api_metadata(workflow_data)
+    # Step 2: Wait for WRROC file
+    wrroc_found = wait_for_wrroc_file(f"{args.outdir}/ro-crate-metadata.json")
 
-    if api_metadata:
-        print("\nExtracted API metadata:")
-        print(json.dumps(api_metadata, indent=2))
+    # Steps 3-4: Extract WRROC metadata, build and send SQS message
+    return publish_run_metadata(args.queue_url, args.region, args.outdir, {}, wrroc_found)
 
-    # Step 4: Wait for WRROC file
-    wrroc_path = f"{outdir}/ro-crate-metadata.json"
-    wrroc_found = wait_for_wrroc_file(wrroc_path)
 
-    # Step 5: Extract WRROC metadata if file exists
-    wrroc_metadata = {}
-    if wrroc_found:
-        wrroc_metadata = extract_wrroc_metadata(wrroc_path)
-        if wrroc_metadata:
-            print("\nExtracted WRROC metadata:")
-            print(json.dumps(wrroc_metadata, indent=2))
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments (all optional in API mode)"""
+    parser = argparse.ArgumentParser(
+        description="Send Seqera Platform workflow metadata to SQS"
+    )
+    parser.add_argument("--queue-url", help="SQS queue URL (enables CLI mode)")
+    parser.add_argument("--region", default="us-east-1", help="SQS queue region (default: us-east-1)")
+    parser.add_argument("--outdir", help="Workflow output folder containing ro-crate-metadata.json")
+    args = parser.parse_args()
 
-    # Step 6: Build and send SQS message
-    message = build_sqs_message(outdir, wrroc_metadata, api_metadata)
-    success = send_sqs_message(queue_url, region, message)
+    # Explicit arguments select CLI mode; otherwise use the API when a token is available
+    cli_mode = bool(args.queue_url or args.outdir) or not os.getenv("TOWER_ACCESS_TOKEN")
+    if cli_mode and not (args.queue_url and args.outdir):
+        parser.error("--queue-url and --outdir are required when TOWER_ACCESS_TOKEN is not set")
+    args.cli_mode = cli_mode
+    return args
+
+
+def main():
+    configure_logging()
+    args = parse_args()
+
+    print_header("SQS Integration - Post-Run Script")
+
+    if boto3 is None:
+        print_header("ERROR: boto3 Not Available")
+        log.info("The AWS SDK for Python (boto3) is not installed in this compute environment.")
+        log.info("Add it to the compute environment image (pip install boto3).")
+        sys.exit(1)
+
+    success = main_cli(args) if args.cli_mode else main_api()
 
     if success:
-        print("\n✓ Post-run script completed successfully")
+        log.info("\n✓ Post-run script completed successfully")
         sys.exit(0)
     else:
         sys.exit(1)
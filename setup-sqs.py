@@ -19,13 +19,37 @@ Steps:
 """
 
 import argparse
+import copy
+import functools
+import hashlib
+import importlib.util
 import json
 import os
 import subprocess
 import sys
-from typing import Optional, Dict, Any, List
-from urllib.request import urlopen
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Tuple, Union
+from pathlib import Path
 from urllib.error import URLError
+from urllib.parse import unquote as _unquote
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Only the exception classes are imported up front; boto3 and urllib3 are
+# imported on first use (get_client, http_pool) so --help stays fast
+try:
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    BotoCoreError = ClientError = Exception
+
+# AWS SDK errors handled by the discovery/update steps
+AWS_ERRORS = (BotoCoreError, ClientError)
 
 
 class Color:
@@ -38,26 +62,38 @@ class Color:
     END = '\033[0m'
 
 
+# Plain output when piped or when NO_COLOR is set (https://no-color.org)
+if not sys.stdout.isatty() or os.environ.get('NO_COLOR'):
+    for _name in ('BLUE', 'GREEN', 'YELLOW', 'RED', 'BOLD', 'END'):
+        setattr(Color, _name, '')
+
+# Message prefixes/suffixes, formatted once
+_HEADER_RULE = f"{Color.BOLD}{'=' * 60}{Color.END}"
+_PREFIX_HEADER = Color.BOLD
+_PREFIX_OK = f"{Color.GREEN}✓ "
+_PREFIX_WARN = f"{Color.YELLOW}⚠ "
+_PREFIX_ERROR = f"{Color.RED}✗ "
+_END = Color.END
+
+
 def print_header(text: str) -> None:
     """Print a formatted header"""
-    print(f"\n{Color.BOLD}{'=' * 60}{Color.END}")
-    print(f"{Color.BOLD}{text}{Color.END}")
-    print(f"{Color.BOLD}{'=' * 60}{Color.END}\n")
+    print("\n" + _HEADER_RULE + "\n" + _PREFIX_HEADER + text + _END + "\n" + _HEADER_RULE + "\n")
 
 
 def print_success(text: str) -> None:
     """Print success message"""
-    print(f"{Color.GREEN}✓ {text}{Color.END}")
+    print(_PREFIX_OK + text + _END)
 
 
 def print_warning(text: str) -> None:
     """Print warning message"""
-    print(f"{Color.YELLOW}⚠ {text}{Color.END}")
+    print(_PREFIX_WARN + text + _END)
 
 
 def print_error(text: str) -> None:
     """Print error message"""
-    print(f"{Color.RED}✗ {text}{Color.END}")
+    print(_PREFIX_ERROR + text + _END)
 
 
 def get_quilt3_catalog() -> Optional[str]:
@@ -82,6 +118,38 @@ def get_quilt3_catalog() -> Optional[str]:
         return None
 
 
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON with orjson when installed, falling back to the stdlib
+
+    Args:
+        data: JSON text or UTF-8 bytes
+
+    Returns:
+        Parsed value
+
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON (orjson's error subclasses it)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=1)
+def http_pool():
+    """
+    Get the keep-alive pool for catalog HTTP fetches (urllib3 ships with botocore)
+
+    Returns:
+        urllib3 PoolManager, created on first use
+    """
+    import urllib3
+    return urllib3.PoolManager(
+        retries=urllib3.Retry(total=2, backoff_factor=0.2)
+    )
+
+
 def fetch_json(url: str) -> Dict[str, Any]:
     """
     Fetch JSON from URL
@@ -93,10 +161,73 @@ def fetch_json(url: str) -> Dict[str, Any]:
         Parsed JSON data
 
     Raises:
-        URLError: If fetch fails
+        URLError: If the server returns a non-200 status or the connection
+            fails after retries
+    """
+    pool = http_pool()
+    import urllib3  # already loaded by http_pool()
+    try:
+        # gzip transfer; urllib3 decodes the body transparently
+        response = pool.request('GET', url, headers={'Accept-Encoding': 'gzip'}, timeout=10)
+    except urllib3.exceptions.HTTPError as e:
+        raise URLError(e) from e
+    if response.status != 200:
+        raise URLError(f"HTTP {response.status} fetching {url}")
+    return json_loads(response.data)
+
+
+# Catalog config.json rarely changes; reuse it across runs for an hour
+CATALOG_CONFIG_TTL_SECONDS = 3600
+
+
+def catalog_cache_path(url: str) -> Path:
     """
-    with urlopen(url, timeout=10) as response:
-        return json.loads(response.read().decode('utf-8'))
+    Get cache file path for a URL under the XDG cache directory
+
+    Args:
+        url: URL being cached
+
+    Returns:
+        Cache file path
+    """
+    cache_home = Path(os.environ.get('XDG_CACHE_HOME', '~/.cache')).expanduser()
+    return cache_home / 'seqera-smoke' / (hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+
+def fetch_json_cached(url: str, ttl: int = CATALOG_CONFIG_TTL_SECONDS) -> Dict[str, Any]:
+    """
+    Fetch JSON from URL, reusing an on-disk copy younger than ttl seconds
+
+    Args:
+        url: URL to fetch
+        ttl: Maximum cache age in seconds
+
+    Returns:
+        Parsed JSON data
+
+    Raises:
+        URLError: If fetch fails and no fresh cache exists
+    """
+    cache_path = catalog_cache_path(url)
+    try:
+        if time.time() - cache_path.stat().st_mtime < ttl:
+            return json_loads(cache_path.read_bytes())
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    data = fetch_json(url)
+
+    # Cache write is best effort; a read-only home must not break setup
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return data
 
 
 def get_catalog_region(catalog_url: str) -> Optional[str]:
@@ -111,33 +242,112 @@ def get_catalog_region(catalog_url: str) -> Optional[str]:
     """
     try:
         config_url = catalog_url.rstrip('/') + '/config.json'
-        config = fetch_json(config_url)
+        config = fetch_json_cached(config_url)
         return config.get('region')
     except (URLError, json.JSONDecodeError, KeyError) as e:
         print_warning(f"Could not fetch catalog config.json: {e}")
         return None
 
 
-def run_aws_command(args: List[str], profile: Optional[str] = None) -> Dict[str, Any]:
+# list_stacks otherwise includes deleted stacks; every other status (including
+# failed updates and rollbacks) is a live stack that may still have outputs
+DELETED_STACK_STATUSES = {'DELETE_COMPLETE'}
+
+# Parallel describe-stacks calls
+DESCRIBE_STACKS_WORKERS = 10
+
+# Parallel per-role IAM permission checks
+CHECK_ROLES_WORKERS = 8
+
+
+@functools.lru_cache(maxsize=1)
+def aws_config():
+    """
+    Get the botocore Config shared by every client
+
+    Adaptive retries absorb throttling under the parallel fan-outs, and the
+    pool is sized so concurrent calls reuse HTTPS connections.
+
+    Returns:
+        botocore Config, created on first use
+    """
+    from botocore.config import Config
+    return Config(
+        retries={'mode': 'adaptive', 'max_attempts': 10},
+        max_pool_connections=20,
+        connect_timeout=3,
+        read_timeout=10,
+    )
+
+
+# boto3 sessions (per profile) and clients (per service/region/profile), created on first use
+_sessions: Dict[Optional[str], Any] = {}
+_clients: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+# Sessions are not thread-safe; clients are, once created
+_clients_lock = threading.Lock()
+
+
+def get_client(service: str, region: Optional[str] = None, profile: Optional[str] = None):
     """
-    Run AWS CLI command and return JSON output
+    Get a cached boto3 client
 
     Args:
-        args: AWS CLI arguments
+        service: AWS service name (e.g. 'cloudformation', 'iam')
+        region: AWS region (None for the profile default)
         profile: AWS profile to use
 
     Returns:
-        Parsed JSON output
+        boto3 client, reused across calls
+    """
+    key = (service, region, profile)
+    with _clients_lock:
+        if key not in _clients:
+            if profile not in _sessions:
+                import boto3
+                _sessions[profile] = boto3.Session(profile_name=profile)
+            _clients[key] = _sessions[profile].client(
+                service,
+                region_name=region,
+                config=aws_config()
+            )
+        return _clients[key]
 
-    Raises:
-        subprocess.CalledProcessError: If command fails
+
+def normalize_url(url: str) -> str:
+    """
+    Strip scheme and trailing slash so catalog URLs compare equal
+
+    Args:
+        url: Catalog URL or host
+
+    Returns:
+        Normalized host/path
+    """
+    if url.startswith('https://'):
+        url = url[8:]
+    elif url.startswith('http://'):
+        url = url[7:]
+    return url.rstrip('/')
+
+
+@functools.lru_cache(maxsize=512)
+def describe_stack(stack_name: str, region: str, profile: Optional[str] = None) -> Dict[str, Any]:
     """
-    cmd = ['aws'] + args + ['--output', 'json']
-    if profile:
-        cmd.extend(['--profile', profile])
+    Describe one CloudFormation stack (cached per stack/region/profile)
 
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    return json.loads(result.stdout) if result.stdout else {}
+    Args:
+        stack_name: Stack name
+        region: AWS region
+        profile: AWS profile to use
+
+    Returns:
+        Stack description; treat as read-only, it is shared between callers
+
+    Raises:
+        BotoCoreError, ClientError: If the describe call fails (failures are not cached)
+    """
+    result = get_client('cloudformation', region, profile).describe_stacks(StackName=stack_name)
+    return result.get('Stacks', [{}])[0]
 
 
 def find_quilt_stack(region: str, catalog_url: str, profile: Optional[str] = None) -> Optional[Dict[str, Any]]:
@@ -155,83 +365,105 @@ def find_quilt_stack(region: str, catalog_url: str, profile: Optional[str] = Non
     print(f"Searching for Quilt CloudFormation stack in {region}...")
 
     try:
-        # List all stacks
-        stacks = run_aws_command(
-            ['cloudformation', 'list-stacks', '--region', region],
-            profile
-        )
+        cf = get_client('cloudformation', region, profile)
+
+        # List live stacks only; statuses come from the service model so new ones are included
+        list_stacks_input = cf.meta.service_model.operation_model('ListStacks').input_shape
+        live_statuses = [
+            status for status in list_stacks_input.members['StackStatusFilter'].member.enum
+            if status not in DELETED_STACK_STATUSES
+        ]
+        stack_summaries = []
+        for page in cf.get_paginator('list_stacks').paginate(StackStatusFilter=live_statuses):
+            stack_summaries.extend(page.get('StackSummaries', []))
 
         # Normalize catalog URL for comparison
-        def normalize_url(url: str) -> str:
-            return url.replace('https://', '').replace('http://', '').rstrip('/')
-
         target_url = normalize_url(catalog_url)
 
-        # Check each stack for QuiltWebHost output
-        for stack_summary in stacks.get('StackSummaries', []):
-            stack_name = stack_summary.get('StackName')
-            if not stack_name:
-                continue
-
+        def check_stack(stack_name: str) -> Optional[Dict[str, Any]]:
+            """Describe one stack and return its info if QuiltWebHost matches"""
             try:
-                # Get stack details
-                stack_details = run_aws_command(
-                    ['cloudformation', 'describe-stacks', '--stack-name', stack_name, '--region', region],
-                    profile
-                )
-
-                stack = stack_details.get('Stacks', [{}])[0]
-                outputs = stack.get('Outputs', [])
-
-                # Look for QuiltWebHost output
-                quilt_web_host = None
-                packager_queue = None
-
-                for output in outputs:
-                    if output.get('OutputKey') == 'QuiltWebHost':
-                        quilt_web_host = output.get('OutputValue')
-                    elif output.get('OutputKey') in ['PackagerQueue', 'PackagerQueueArn']:
-                        value = output.get('OutputValue', '')
-                        # If it's an ARN, extract the URL
-                        if value.startswith('arn:aws:sqs:'):
-                            # ARN format: arn:aws:sqs:region:account:queue-name
-                            parts = value.split(':')
-                            if len(parts) >= 6:
-                                queue_region = parts[3]
-                                account_id = parts[4]
-                                queue_name = parts[5]
-                                packager_queue = f"https://sqs.{queue_region}.amazonaws.com/{account_id}/{queue_name}"
-                        else:
-                            packager_queue = value
-
-                # Check if this matches our catalog
-                if quilt_web_host and normalize_url(quilt_web_host) == target_url:
-                    print_success(f"Found stack: {stack_name}")
-
-                    # Extract stack ARN to get account ID
-                    stack_arn = stack.get('StackId', '')
-                    account_id = None
-                    if stack_arn:
-                        parts = stack_arn.split(':')
-                        if len(parts) >= 5:
-                            account_id = parts[4]
-
-                    return {
-                        'stack_name': stack_name,
-                        'stack_arn': stack_arn,
-                        'region': region,
-                        'account_id': account_id,
-                        'catalog_url': quilt_web_host,
-                        'packager_queue_url': packager_queue,
-                    }
-
-            except subprocess.CalledProcessError:
+                stack = describe_stack(stack_name, region, profile)
+            except AWS_ERRORS:
                 # Skip stacks we can't access
+                return None
+
+            outputs = stack.get('Outputs', [])
+
+            outputs_by_key = {o.get('OutputKey'): o.get('OutputValue', '') for o in outputs}
+
+            # Check if this matches our catalog before looking at anything else
+            quilt_web_host = outputs_by_key.get('QuiltWebHost')
+            if not quilt_web_host or normalize_url(quilt_web_host) != target_url:
+                return None
+
+            # Look for PackagerQueue output (ARN or URL, depending on stack version)
+            value = outputs_by_key.get('PackagerQueueArn') or outputs_by_key.get('PackagerQueue') or ''
+            packager_queue = None
+            packager_queue_arn = None
+            # If it's an ARN, keep it and extract the URL
+            if value.startswith('arn:aws:sqs:'):
+                packager_queue_arn = value
+                # ARN format: arn:aws:sqs:region:account:queue-name
+                parts = value.split(':', 5)
+                if len(parts) == 6:
+                    packager_queue = f"https://sqs.{parts[3]}.amazonaws.com/{parts[4]}/{parts[5]}"
+            elif value:
+                packager_queue = value
+
+            # Extract stack ARN to get account ID
+            stack_arn = stack.get('StackId', '')
+            account_id = None
+            if stack_arn:
+                parts = stack_arn.split(':')
+                if len(parts) >= 5:
+                    account_id = parts[4]
+
+            return {
+                'stack_name': stack_name,
+                'stack_arn': stack_arn,
+                'region': region,
+                'account_id': account_id,
+                'catalog_url': quilt_web_host,
+                'packager_queue_url': packager_queue,
+                'packager_queue_arn': packager_queue_arn,
+            }
+
+        def scan(stack_names: List[str]) -> Optional[Dict[str, Any]]:
+            """Describe stacks in parallel and stop at the first QuiltWebHost match"""
+            executor = ThreadPoolExecutor(max_workers=DESCRIBE_STACKS_WORKERS)
+            try:
+                futures = [executor.submit(check_stack, name) for name in stack_names]
+                for future in as_completed(futures):
+                    stack_info = future.result()
+                    if stack_info:
+                        return stack_info
+                return None
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        # Stacks whose name or template description mentions Quilt first,
+        # then the rest only if none match
+        candidates = []
+        others = []
+        for summary in stack_summaries:
+            name = summary.get('StackName')
+            if not name:
                 continue
+            if 'quilt' in name.lower() or 'quilt' in (summary.get('TemplateDescription') or '').lower():
+                candidates.append(name)
+            else:
+                others.append(name)
 
-        return None
+        stack_info = scan(candidates) if candidates else None
+        if not stack_info and others:
+            stack_info = scan(others)
 
-    except subprocess.CalledProcessError as e:
+        if stack_info:
+            print_success(f"Found stack: {stack_info['stack_name']}")
+        return stack_info
+
+    except AWS_ERRORS as e:
         print_error(f"Failed to list CloudFormation stacks: {e}")
         return None
 
@@ -249,12 +481,12 @@ def get_queue_arn(queue_url: str, region: str, profile: Optional[str] = None) ->
         Queue ARN or None if not found
     """
     try:
-        attrs = run_aws_command(
-            ['sqs', 'get-queue-attributes', '--queue-url', queue_url, '--attribute-names', 'QueueArn', '--region', region],
-            profile
+        attrs = get_client('sqs', region, profile).get_queue_attributes(
+            QueueUrl=queue_url,
+            AttributeNames=['QueueArn']
         )
         return attrs.get('Attributes', {}).get('QueueArn')
-    except subprocess.CalledProcessError as e:
+    except AWS_ERRORS as e:
         print_error(f"Failed to get queue ARN: {e}")
         return None
 
@@ -273,16 +505,19 @@ def find_tower_forge_roles(region: str, profile: Optional[str] = None) -> List[D
     print(f"\nSearching for TowerForge roles in {region}...")
 
     try:
-        roles = run_aws_command(['iam', 'list-roles'], profile)
+        iam = get_client('iam', profile=profile)
 
         tower_roles = []
-        for role in roles.get('Roles', []):
-            role_name = role.get('RoleName', '')
-            if 'TowerForge' in role_name and ('FargateRole' in role_name or 'InstanceRole' in role_name):
-                tower_roles.append({
-                    'role_name': role_name,
-                    'role_arn': role.get('Arn', ''),
-                })
+        # IAM caps MaxItems at 1000; the default page of 100 costs 10x the calls
+        pages = iam.get_paginator('list_roles').paginate(PaginationConfig={'PageSize': 1000})
+        for page in pages:
+            for role in page.get('Roles', []):
+                role_name = role.get('RoleName', '')
+                if 'TowerForge' in role_name and ('FargateRole' in role_name or 'InstanceRole' in role_name):
+                    tower_roles.append({
+                        'role_name': role_name,
+                        'role_arn': role.get('Arn', ''),
+                    })
 
         if tower_roles:
             print_success(f"Found {len(tower_roles)} TowerForge role(s)")
@@ -293,11 +528,41 @@ def find_tower_forge_roles(region: str, profile: Optional[str] = None) -> List[D
 
         return tower_roles
 
-    except subprocess.CalledProcessError as e:
+    except AWS_ERRORS as e:
         print_error(f"Failed to list IAM roles: {e}")
         return []
 
 
+@functools.lru_cache(maxsize=256)
+def get_role_policy_cached(role_name: str, policy_name: str, profile: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get inline role policy document (cached per role/policy)
+
+    Args:
+        role_name: IAM role name
+        policy_name: Policy name
+        profile: AWS profile to use
+
+    Returns:
+        Policy document shared between callers (do not modify), or None if the
+        policy has no document
+
+    Raises:
+        BotoCoreError, ClientError: If the IAM call fails (failures are not cached)
+    """
+    result = get_client('iam', profile=profile).get_role_policy(
+        RoleName=role_name,
+        PolicyName=policy_name
+    )
+    policy_doc = result.get('PolicyDocument')
+
+    # Policy document might be URL-encoded string, decode if needed
+    if isinstance(policy_doc, str):
+        policy_doc = json_loads(_unquote(policy_doc))
+
+    return policy_doc
+
+
 def get_role_policy(role_name: str, policy_name: str, profile: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Get inline role policy document
@@ -308,23 +573,57 @@ def get_role_policy(role_name: str, policy_name: str, profile: Optional[str] = N
         profile: AWS profile to use
 
     Returns:
-        Policy document or None if not found
+        Policy document (a fresh copy, safe to modify) or None if not found
     """
     try:
-        result = run_aws_command(
-            ['iam', 'get-role-policy', '--role-name', role_name, '--policy-name', policy_name],
-            profile
-        )
-        policy_doc = result.get('PolicyDocument')
+        return copy.deepcopy(get_role_policy_cached(role_name, policy_name, profile))
+    except AWS_ERRORS:
+        return None
 
-        # Policy document might be URL-encoded string, decode if needed
-        if isinstance(policy_doc, str):
-            from urllib.parse import unquote
-            policy_doc = json.loads(unquote(policy_doc))
 
-        return policy_doc
-    except subprocess.CalledProcessError:
-        return None
+def policy_grants_send_message(policy_doc: Any, queue_arn: str) -> bool:
+    """
+    Check if a policy document grants sqs:SendMessage on the queue
+
+    Args:
+        policy_doc: Parsed policy document
+        queue_arn: SQS queue ARN
+
+    Returns:
+        True if some statement grants the permission
+    """
+    if not policy_doc or not isinstance(policy_doc, dict):
+        return False
+
+    # Check each statement for SQS permission
+    statements = policy_doc.get('Statement', [])
+    if not isinstance(statements, list):
+        return False
+
+    for statement in statements:
+        if not isinstance(statement, dict):
+            continue
+
+        actions = statement.get('Action', [])
+        if isinstance(actions, str):
+            actions = [actions]
+        elif not isinstance(actions, list):
+            continue
+
+        resources = statement.get('Resource', [])
+        if isinstance(resources, str):
+            resources = [resources]
+        elif not isinstance(resources, list):
+            continue
+
+        # Check if this statement grants sqs:SendMessage for our queue
+        has_send_message = 'sqs:SendMessage' in actions or 'sqs:*' in actions
+        has_queue = queue_arn in resources or '*' in resources
+
+        if has_send_message and has_queue:
+            return True
+
+    return False
 
 
 def check_sqs_permission(role_name: str, queue_arn: str, profile: Optional[str] = None) -> bool:
@@ -340,48 +639,23 @@ def check_sqs_permission(role_name: str, queue_arn: str, profile: Optional[str]
         True if permission exists
     """
     try:
-        # List inline policies
-        policies = run_aws_command(
-            ['iam', 'list-role-policies', '--role-name', role_name],
-            profile
-        )
-
-        for policy_name in policies.get('PolicyNames', []):
-            policy_doc = get_role_policy(role_name, policy_name, profile)
-            if not policy_doc or not isinstance(policy_doc, dict):
-                continue
+        # Stream inline policy names page by page so a match stops further listing
+        iam = get_client('iam', profile=profile)
+        pages = iam.get_paginator('list_role_policies').paginate(RoleName=role_name)
+        policy_names = (name for page in pages for name in page.get('PolicyNames', []))
 
-            # Check each statement for SQS permission
-            statements = policy_doc.get('Statement', [])
-            if not isinstance(statements, list):
+        for policy_name in policy_names:
+            try:
+                policy_doc = get_role_policy_cached(role_name, policy_name, profile)
+            except AWS_ERRORS:
                 continue
 
-            for statement in statements:
-                if not isinstance(statement, dict):
-                    continue
-
-                actions = statement.get('Action', [])
-                if isinstance(actions, str):
-                    actions = [actions]
-                elif not isinstance(actions, list):
-                    continue
-
-                resources = statement.get('Resource', [])
-                if isinstance(resources, str):
-                    resources = [resources]
-                elif not isinstance(resources, list):
-                    continue
-
-                # Check if this statement grants sqs:SendMessage for our queue
-                has_send_message = 'sqs:SendMessage' in actions or 'sqs:*' in actions
-                has_queue = queue_arn in resources or '*' in resources
-
-                if has_send_message and has_queue:
-                    return True
+            if policy_grants_send_message(policy_doc, queue_arn):
+                return True
 
         return False
 
-    except (subprocess.CalledProcessError, AttributeError, TypeError) as e:
+    except AWS_ERRORS + (AttributeError, TypeError, json.JSONDecodeError) as e:
         print_warning(f"Error checking policy for {role_name}: {e}")
         return False
 
@@ -406,34 +680,41 @@ def add_sqs_permission(role_name: str, queue_arn: str, profile: Optional[str] =
             print_error("Role does not have 'nextflow-policy' inline policy")
             return False
 
-        # Add SQS statement
-        sqs_statement = {
-            "Sid": "SQSSendMessage",
-            "Effect": "Allow",
-            "Action": "sqs:SendMessage",
-            "Resource": queue_arn
-        }
-
-        policy_doc['Statement'].append(sqs_statement)
-
-        # Write updated policy
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(policy_doc, f, indent=2)
-            policy_file = f.name
-
-        try:
-            run_aws_command(
-                ['iam', 'put-role-policy', '--role-name', role_name, '--policy-name', 'nextflow-policy', '--policy-document', f'file://{policy_file}'],
-                profile
-            )
-            print_success(f"Updated {role_name} with SQS permission")
-            return True
-        finally:
-            import os
-            os.unlink(policy_file)
+        # Merge into an SQS statement added by a previous run (e.g. for another
+        # queue) so repeated runs don't grow the policy by one statement each
+        existing = next(
+            (st for st in policy_doc['Statement']
+             if isinstance(st, dict) and st.get('Sid') == 'SQSSendMessage'),
+            None
+        )
+        if existing is not None:
+            resources = existing.get('Resource', [])
+            if isinstance(resources, str):
+                resources = [resources]
+            merged = sorted(set(resources) | {queue_arn})
+            existing['Resource'] = merged[0] if len(merged) == 1 else merged
+        else:
+            # Add SQS statement
+            sqs_statement = {
+                "Sid": "SQSSendMessage",
+                "Effect": "Allow",
+                "Action": "sqs:SendMessage",
+                "Resource": queue_arn
+            }
+
+            policy_doc['Statement'].append(sqs_statement)
+
+        # Write updated policy (compact JSON counts less toward IAM's policy size quota)
+        get_client('iam', profile=profile).put_role_policy(
+            RoleName=role_name,
+            PolicyName='nextflow-policy',
+            PolicyDocument=json.dumps(policy_doc, separators=(',', ':'))
+        )
+        get_role_policy_cached.cache_clear()
+        print_success(f"Updated {role_name} with SQS permission")
+        return True
 
-    except subprocess.CalledProcessError as e:
+    except AWS_ERRORS as e:
         print_error(f"Failed to update policy: {e}")
         return False
 
@@ -515,6 +796,10 @@ def main():
 
     print_header("Seqera Platform SQS Integration Setup")
 
+    if importlib.util.find_spec('boto3') is None:
+        print_error("boto3 is required: pip install boto3")
+        sys.exit(1)
+
     # Step 0: Prompt for AWS profile if not provided
     aws_profile = args.profile
     if not aws_profile and not args.yes:
@@ -576,7 +861,8 @@ def main():
 
     print_success(f"Found PackagerQueue: {queue_url}")
 
-    queue_arn = get_queue_arn(queue_url, region, aws_profile)
+    # Stack outputs usually carry the ARN already; only ask SQS when they don't
+    queue_arn = stack_info.get('packager_queue_arn') or get_queue_arn(queue_url, region, aws_profile)
     if not queue_arn:
         print_error("Could not retrieve queue ARN")
         sys.exit(1)
@@ -600,6 +886,14 @@ def main():
     print(f"Queue ARN:      {queue_arn}")
     print(f"\nTowerForge Roles Found: {len(tower_roles)}")
 
+    # Check all roles' existing permissions in parallel; the IAM calls are
+    # independent, while prompts and updates below stay sequential
+    with ThreadPoolExecutor(max_workers=CHECK_ROLES_WORKERS) as executor:
+        permission_checks = {
+            role['role_name']: executor.submit(check_sqs_permission, role['role_name'], queue_arn, aws_profile)
+            for role in tower_roles
+        }
+
     # Check and update each role
     updated_roles = []
     for role in tower_roles:
@@ -607,7 +901,7 @@ def main():
         print(f"\n{Color.BOLD}Role: {role_name}{Color.END}")
 
         # Check if permission already exists
-        if check_sqs_permission(role_name, queue_arn, aws_profile):
+        if permission_checks[role_name].result():
             print_success("Already has SQS SendMessage permission")
             updated_roles.append(role_name)
             continue
@@ -654,6 +948,5 @@ if __name__ == '__main__':
         sys.exit(1)
     except Exception as e:
         print_error(f"Unexpected error: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)